@@ -1,4 +1,30 @@
 # Implementation inspired by DSA course materials
+import operator
+from array import array
+from collections import Counter
+from itertools import accumulate, compress, islice, repeat
+
+# Approximate number of characters of element lines parsed per batch
+_BLOCK_SIZE = 1 << 20
+
+# Signed array typecodes, narrowest first
+_SIGNED_TYPECODES = ('b', 'h', 'i', 'l', 'q')
+
+def _typed_array(items, low, high):
+    """
+    Pack integers into the narrowest signed array type holding [low, high]
+    
+    Falls back to a 'd' (float) array for non-integer items or values wider
+    than 64 bits.
+    """
+    for typecode in _SIGNED_TYPECODES:
+        limit = 1 << (8 * array(typecode).itemsize - 1)
+        if -limit <= low and high < limit:
+            try:
+                return array(typecode, items)
+            except TypeError:
+                break
+    return array('d', items)
 
 class MatrixDimensionError(Exception):
     """Custom exception for matrix dimension mismatches"""
@@ -24,14 +50,54 @@ class SparseMatrix:
     
     def __init__(self, source=None, rows=0, cols=0):
         """Initialize sparse matrix from file or dimensions"""
-        self.data = {}  # {row: {col: value}}
+        self._data = {}  # {row: {col: value}}, exposed through the data property
         self.rows = rows
         self.cols = cols
         self.nnz = 0  # Number of non-zero elements
+        self._csr = None  # Cached to_csr() result, cleared by _modified
+        self._ordered = True  # Rows and each row's columns stored in ascending order
         
         if isinstance(source, str):
             self._load_from_file(source)
     
+    @property
+    def data(self):
+        """
+        The {row: {col: value}} storage
+        
+        The dictionaries may be written to directly, so every access drops
+        the cached to_csr result and the assumption that the storage is
+        sorted. Write through the returned dictionary right away rather than
+        keeping it across other calls.
+        """
+        self._modified(ordered=False)
+        return self._data
+    
+    def _modified(self, ordered=True):
+        """
+        Drop state derived from the storage after it may have changed
+        
+        Clears the cached to_csr result. Pass ordered=False when rows or
+        columns may no longer be in ascending order.
+        """
+        self._csr = None
+        if not ordered:
+            self._ordered = False
+    
+    @classmethod
+    def _from_data(cls, data, rows, cols, nnz=None):
+        """
+        Wrap an already built {row: {col: value}} dictionary without copying
+        
+        Used by operations that assemble their result storage directly. The
+        dictionary must hold only in-range, non-zero values and no empty rows.
+        """
+        matrix = cls(rows=rows, cols=cols)
+        matrix._data = data
+        matrix.nnz = sum(map(len, data.values())) if nnz is None else nnz
+        matrix._ordered = False
+        return matrix
+    
     def _load_from_file(self, file_path):
         """
         Parse matrix file and load data with strict dimension checking
@@ -51,74 +117,231 @@ class SparseMatrix:
                 except ValueError:
                     raise ValueError("Invalid dimension values")
                 
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    if not (line.startswith('(') and line.endswith(')')):
-                        raise ValueError(f"Invalid format: {line}")
-                    
-                    values = [v.strip() for v in line[1:-1].split(',')]
-                    if len(values) != 3:
-                        raise ValueError(f"Invalid element format: {line}")
-                    
-                    try:
-                        row, col, value = map(int, values)
-                        # Adjust indices if they match the dimensions exactly
-                        if row == self.rows:
-                            row -= 1
-                        if col == self.cols:
-                            col -= 1
-                        
-                        # Strict dimension checking
-                        if row < 0 or row >= self.rows:
-                            raise MatrixIndexError(f"Row index {row} out of range [0, {self.rows-1}]")
-                        if col < 0 or col >= self.cols:
-                            raise MatrixIndexError(f"Column index {col} out of range [0, {self.cols-1}]")
-                        
-                        if value != 0:
-                            self.data[row] = self.data.get(row, {})
-                            self.data[row][col] = value
-                            self.nnz += 1
-                    except ValueError:
-                        raise ValueError(f"Invalid numeric values in line: {line}")
-                    
+                # Parse the body in bounded blocks of lines and merge each
+                # into the storage, so only one block is held in temporaries
+                while True:
+                    lines = f.readlines(_BLOCK_SIZE)
+                    if not lines:
+                        break
+                    self._load_block(lines)
+        
         except FileNotFoundError:
             raise FileNotFoundError(f"Matrix file not found: {file_path}")
         except ValueError as e:
             raise ValueError(f"Invalid matrix file format: {str(e)}")
     
+    def _load_block(self, lines):
+        """
+        Parse a block of element lines and merge it into the storage
+        
+        Falls back to line-by-line parsing on anything unusual so errors
+        still point at the offending line.
+        """
+        elements = self._parse_elements_fast(lines)
+        if elements is None:
+            elements = self._parse_elements(lines)
+        self._add_triples(*elements)
+    
+    def _parse_elements_fast(self, lines):
+        """
+        Parse a block of element lines in bulk
+        
+        Joins the block and splits it into "(", row, ",", col, ",", value,
+        ")" tokens with a few str.replace calls, checks the token layout with
+        list slicing and converts each column of numbers with a single
+        map(int, ...), instead of handling every line in Python.
+        
+        Returns:
+            tuple: (rows, cols, values) lists, or None if the block needs the
+            line-by-line parser (malformed lines or out-of-range indices)
+        """
+        block = ''.join(lines)
+        tokens = block.replace('(', ' ( ').replace(',', ' , ').replace(')', ' ) ').split()
+        count = len(tokens) // 7
+        if (len(tokens) % 7
+                or tokens[0::7].count('(') != count
+                or tokens[2::7].count(',') != count
+                or tokens[4::7].count(',') != count
+                or tokens[6::7].count(')') != count):
+            return None
+        
+        # Exactly one element on every non-blank line: each ")" ends a line
+        # and the non-blank lines are as many as the elements. Lines holding
+        # only whitespace go to the line-by-line parser.
+        closed_lines = block.count(')\n') + block.endswith(')')
+        if closed_lines != count or len(lines) - lines.count('\n') != count:
+            return None
+        
+        try:
+            rows = list(map(int, tokens[1::7]))
+            cols = list(map(int, tokens[3::7]))
+            values = list(map(int, tokens[5::7]))
+        except ValueError:
+            return None
+        
+        if not rows:
+            return rows, cols, values
+        
+        # Adjust indices if they match the dimensions exactly
+        if self.rows in rows:
+            rows = [row - 1 if row == self.rows else row for row in rows]
+        if self.cols in cols:
+            cols = [col - 1 if col == self.cols else col for col in cols]
+        
+        if min(rows) < 0 or max(rows) >= self.rows or min(cols) < 0 or max(cols) >= self.cols:
+            return None
+        
+        if 0 in values:
+            keep = [value != 0 for value in values]
+            rows = list(compress(rows, keep))
+            cols = list(compress(cols, keep))
+            values = list(compress(values, keep))
+        
+        return rows, cols, values
+    
+    def _parse_elements(self, lines):
+        """
+        Parse element lines one at a time with strict dimension checking
+        
+        Returns:
+            tuple: (rows, cols, values) lists of the non-zero elements
+        """
+        rows_list = []
+        cols_list = []
+        vals_list = []
+        
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            
+            if not (line.startswith('(') and line.endswith(')')):
+                raise ValueError(f"Invalid format: {line}")
+            
+            values = [v.strip() for v in line[1:-1].split(',')]
+            if len(values) != 3:
+                raise ValueError(f"Invalid element format: {line}")
+            
+            try:
+                row, col, value = map(int, values)
+                # Adjust indices if they match the dimensions exactly
+                if row == self.rows:
+                    row -= 1
+                if col == self.cols:
+                    col -= 1
+                
+                # Strict dimension checking
+                if row < 0 or row >= self.rows:
+                    raise MatrixIndexError(f"Row index {row} out of range [0, {self.rows-1}]")
+                if col < 0 or col >= self.cols:
+                    raise MatrixIndexError(f"Column index {col} out of range [0, {self.cols-1}]")
+                
+                if value != 0:
+                    rows_list.append(row)
+                    cols_list.append(col)
+                    vals_list.append(value)
+            except ValueError:
+                raise ValueError(f"Invalid numeric values in line: {line}")
+        
+        return rows_list, cols_list, vals_list
+    
+    def _add_triples(self, rows, cols, values):
+        """
+        Merge parallel row, column and value lists of non-zero elements
+        
+        Elements are sorted by (row, col) first, so each row is a contiguous
+        slice stored with a single dict(zip(...)) or dict.update, and the
+        storage stays in ascending order when the elements come after those
+        already stored. Duplicate positions are canonicalized: the later
+        entry wins.
+        
+        Time Complexity: O(n log n) where n is number of elements
+        """
+        if not rows:
+            return
+        
+        keys = list(map(operator.add, map(operator.mul, rows, repeat(self.cols)), cols))
+        if not all(map(operator.le, keys, islice(keys, 1, None))):
+            # Stable sort, so duplicates keep their file order
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            rows = [rows[i] for i in order]
+            cols = [cols[i] for i in order]
+            values = [values[i] for i in order]
+        
+        data = self._data
+        ordered = True
+        if data:
+            last_row = next(reversed(data))
+            last_col = next(reversed(data[last_row]))
+            ordered = (rows[0], cols[0]) > (last_row, last_col)
+        
+        start = 0
+        for row, size in Counter(rows).items():
+            end = start + size
+            row_data = data.setdefault(row, {})
+            before = len(row_data)
+            row_data.update(zip(cols[start:end], values[start:end]))
+            self.nnz += len(row_data) - before
+            start = end
+        self._modified(ordered)
+    
     def to_csr(self):
         """
-        Convert matrix to CSR (Compressed Sparse Row) format
+        Convert matrix to CSR (Compressed Sparse Row) arrays, not lists
+        
+        Integers use the narrowest signed typecode that fits; values that are
+        not integers or are wider than 64 bits make the values array 'd'
+        (float). Use list() or tolist() where lists are needed.
         
         Returns:
-            tuple: (values, col_indices, row_ptr)
+            tuple: (values, col_indices, row_ptr) arrays
+        
+        The arrays are cached until the matrix is next modified, and every
+        call returns fresh copies of them, so callers may change the result.
         
         Time Complexity: O(n) where n is number of non-zero elements
         """
-        if not self.data:
-            return [], [], [0]
+        if self._csr is None:
+            self._csr = self._build_csr()
+        return tuple(part[:] for part in self._csr)
+    
+    def _build_csr(self):
+        """
+        Build the (values, col_indices, row_ptr) triple returned by to_csr
+        
+        Each part is packed into the narrowest array type that fits, which
+        takes a fraction of the memory of a list of int objects.
+        """
+        self._sort_storage()
         
         values = []
         col_indices = []
-        row_ptr = [0]
-        
-        count = 0
-        for row in range(self.rows):
-            if row in self.data:
-                for col in sorted(self.data[row].keys()):
-                    values.append(self.data[row][col])
-                    col_indices.append(col)
-                    count += 1
-            row_ptr.append(count)
-        
-        return values, col_indices, row_ptr
+        row_sizes = [0] * (self.rows + 1)
+        
+        # Only populated rows are visited; row_ptr is the running total of
+        # the row sizes
+        for row, row_data in self._data.items():
+            col_indices.extend(row_data)
+            values.extend(row_data.values())
+            row_sizes[row + 1] = len(row_data)
+        row_ptr = list(accumulate(row_sizes))
+        count = row_ptr[-1]
+        
+        index_high = max(self.cols, count)
+        return (
+            _typed_array(values, min(values, default=0), max(values, default=0)),
+            _typed_array(col_indices, 0, index_high),
+            _typed_array(row_ptr, 0, index_high),
+        )
     
-    def add(self, other):
+    def _elementwise_operation(self, other, operation, verb):
         """
-        Add two sparse matrices with strict dimension checking
+        Combine two matrices element by element (shared by add and subtract)
+        
+        Works on the underlying dictionaries directly: rows of self are
+        copied, then each element of other is folded in with one lookup and
+        one store, skipping the bounds checks of get_element/set_element.
+        nnz is counted once at the end.
         
         Raises:
             MatrixDimensionError: If matrix dimensions don't match exactly
@@ -127,24 +350,63 @@ class SparseMatrix:
         """
         if (self.rows, self.cols) != (other.rows, other.cols):
             raise MatrixDimensionError(
-                f"Cannot add matrices of different dimensions: "
+                f"Cannot {verb} matrices of different dimensions: "
                 f"{self.rows}x{self.cols} and {other.rows}x{other.cols}"
             )
         
-        result = SparseMatrix(rows=self.rows, cols=self.cols)
+        # Copy elements from self
+        data = {row: dict(cols) for row, cols in self._data.items()}
         
-        # Add elements from self
-        for row in self.data:
-            for col, value in self.data[row].items():
-                result.set_element(row, col, value)
+        # Combine elements from other
+        for row, cols in other._data.items():
+            row_data = data.get(row)
+            if row_data is None:
+                # Row only present in other: no lookups or deletions needed
+                data[row] = {col: operation(0, value) for col, value in cols.items()}
+                continue
+            current = row_data.get
+            for col, value in cols.items():
+                new_value = operation(current(col, 0), value)
+                if new_value != 0:
+                    row_data[col] = new_value
+                else:
+                    del row_data[col]
+            if not row_data:
+                del data[row]
+        
+        return SparseMatrix._from_data(data, self.rows, self.cols)
+    
+    def _sort_storage(self):
+        """
+        Reorder storage in place so rows and columns are in ascending order
+        
+        Done at most once between writes, so repeated to_csr and save_to_file
+        calls read the dictionaries in order without sorting again. The
+        dictionaries are refilled rather than replaced, so references taken
+        from the data property stay valid.
+        """
+        if self._ordered:
+            return
+        data = self._data
+        rows = sorted(data.items())
+        data.clear()
+        for row, row_data in rows:
+            items = sorted(row_data.items())
+            row_data.clear()
+            row_data.update(items)
+            data[row] = row_data
+        self._ordered = True
+    
+    def add(self, other):
+        """
+        Add two sparse matrices with strict dimension checking
         
-        # Add elements from other
-        for row in other.data:
-            for col, value in other.data[row].items():
-                current = result.get_element(row, col)
-                result.set_element(row, col, current + value)
+        Raises:
+            MatrixDimensionError: If matrix dimensions don't match exactly
         
-        return result
+        Time Complexity: O(n) where n is total non-zero elements
+        """
+        return self._elementwise_operation(other, operator.add, "add")
     
     def subtract(self, other):
         """
@@ -155,38 +417,19 @@ class SparseMatrix:
         
         Time Complexity: O(n) where n is total non-zero elements
         """
-        if (self.rows, self.cols) != (other.rows, other.cols):
-            raise MatrixDimensionError(
-                f"Cannot subtract matrices of different dimensions: "
-                f"{self.rows}x{self.cols} and {other.rows}x{other.cols}"
-            )
-        
-        result = SparseMatrix(rows=self.rows, cols=self.cols)
-        
-        # Add elements
-        for row in self.data:
-            for col, value in self.data[row].items():
-                result.set_element(row, col, value)
-        
-        # Subtract elements from other
-        for row in other.data:
-            for col, value in other.data[row].items():
-                current = result.get_element(row, col)
-                result.set_element(row, col, current - value)
-        
-        return result
+        return self._elementwise_operation(other, operator.sub, "subtract")
     
     def multiply(self, other):
         """
-        Multiply two sparse matrices using optimized CSR format
+        Multiply two sparse matrices row by row (Gustavson's algorithm)
         
         Algorithm:
-        1. Convert both matrices to CSR format
-        2. Use sparse matrix multiplication algorithm optimized for CSR
-        3. Convert result back to dictionary format
+        1. For each stored row of self, scale and sum the matching rows of other
+        2. Accumulate partial sums in a dense list indexed by column
+        3. Copy the touched non-zero columns into the result and reset them
         
         Time Complexity: O(n*m) where n,m are non-zero elements
-        Space Complexity: O(n+m) for CSR storage
+        Space Complexity: O(c) extra for the accumulator, c = other.cols
         """
         if self.cols != other.rows:
             raise MatrixDimensionError(
@@ -194,25 +437,38 @@ class SparseMatrix:
                 f"First matrix columns ({self.cols}) must match second matrix rows ({other.rows})"
             )
         
-        result = SparseMatrix(rows=self.rows, cols=other.cols)
-        
-        # Optimized multiplication directly using dictionary format
-        for row in self.data:
-            row_data = {}  # Temporary storage for row results
-            for k, v1 in self.data[row].items():
-                if k in other.data:
-                    for col, v2 in other.data[k].items():
-                        row_data[col] = row_data.get(col, 0) + v1 * v2
+        # Gustavson's row-by-row algorithm with a dense accumulator: partial
+        # sums for the current row go into a list indexed by column, and the
+        # columns touched are remembered so only they are read back and reset
+        result_data = {}
+        nnz = 0
+        other_row = other._data.get
+        accumulator = [0] * other.cols
+        
+        for row, cols in self._data.items():
+            touched = []
+            mark = touched.append
+            for k, v1 in cols.items():
+                other_cols = other_row(k)
+                if other_cols is None:
+                    continue
+                for col, v2 in other_cols.items():
+                    if accumulator[col] == 0:
+                        mark(col)
+                    accumulator[col] += v1 * v2
             
             # Only store non-zero results
-            for col, value in row_data.items():
+            row_data = {}
+            for col in touched:
+                value = accumulator[col]
                 if value != 0:
-                    if row not in result.data:
-                        result.data[row] = {}
-                    result.data[row][col] = value
-                    result.nnz += 1
+                    row_data[col] = value
+                    accumulator[col] = 0
+            if row_data:
+                result_data[row] = row_data
+                nnz += len(row_data)
         
-        return result
+        return SparseMatrix._from_data(result_data, self.rows, other.cols, nnz)
     
     def get_element(self, row, col):
         """
@@ -222,7 +478,7 @@ class SparseMatrix:
         """
         if row >= self.rows or col >= self.cols:
             return 0  # Return 0 for any position outside current dimensions
-        return self.data.get(row, {}).get(col, 0)
+        return self._data.get(row, {}).get(col, 0)
     
     def set_element(self, row, col, value):
         """
@@ -237,26 +493,50 @@ class SparseMatrix:
             raise MatrixIndexError(f"Column index {col} out of range [0, {self.cols-1}]")
         
         if value != 0:
-            if row not in self.data:
-                self.data[row] = {}
-            self.data[row][col] = value
-        elif row in self.data and col in self.data[row]:
-            del self.data[row][col]
-            if not self.data[row]:
-                del self.data[row]
+            row_data = self._data.get(row)
+            if row_data is None:
+                row_data = self._data[row] = {}
+            size = len(row_data)
+            row_data[col] = value
+            if len(row_data) != size:
+                # A new entry may land out of order
+                self.nnz += 1
+                self._modified(ordered=False)
+                return
+        else:
+            try:
+                row_data = self._data[row]
+                del row_data[col]
+            except KeyError:
+                return
+            self.nnz -= 1
+            if not row_data:
+                del self._data[row]
+        self._modified()
     
     def transpose(self):
         """
         Transpose the matrix
         
+        Builds the transposed dictionaries in a single pass. When rows are
+        visited in ascending order, every transposed row receives its columns
+        in ascending order too, so only the outer keys need sorting to keep
+        the result ordered.
+        
         Time Complexity: O(n) where n is number of non-zero elements
         """
-        result = SparseMatrix(rows=self.cols, cols=self.rows)
-        
-        for row in self.data:
-            for col, value in self.data[row].items():
-                result.set_element(col, row, value)
-        
+        data = {}
+        rows = self._data if self._ordered else sorted(self._data)
+        for row in rows:
+            for col, value in self._data[row].items():
+                target = data.get(col)
+                if target is None:
+                    target = data[col] = {}
+                target[row] = value
+        
+        data = {col: data[col] for col in sorted(data)}
+        result = SparseMatrix._from_data(data, self.cols, self.rows, self.nnz)
+        result._ordered = True
         return result
     
     def save_to_file(self, file_path):
@@ -268,9 +548,9 @@ class SparseMatrix:
                 f.write(f"cols={self.cols}\n")
                 
                 # Write elements with proper spacing after commas
-                for row in sorted(self.data.keys()):
-                    for col in sorted(self.data[row].keys()):
-                        value = self.data[row][col]
+                self._sort_storage()
+                for row, row_data in self._data.items():
+                    for col, value in row_data.items():
                         if value != 0:
                             f.write(f"({row}, {col}, {value})\n")
                             
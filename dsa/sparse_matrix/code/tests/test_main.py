@@ -0,0 +1,198 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from array import array
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import main
+from main import MatrixIndexError, SparseMatrix
+
+
+class MatrixFileTestCase(unittest.TestCase):
+    """Writes matrix files into a temporary directory"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def write(self, text, name='matrix.txt', newline=None):
+        path = os.path.join(self._tmp.name, name)
+        with open(path, 'w', newline=newline) as f:
+            f.write(text)
+        return path
+
+    def saved_lines(self, matrix):
+        path = os.path.join(self._tmp.name, 'saved.txt')
+        matrix.save_to_file(path)
+        with open(path) as f:
+            return f.read().splitlines()
+
+
+class ParserAgreementTest(unittest.TestCase):
+    """The bulk parser must match the line-by-line parser or defer to it"""
+
+    def setUp(self):
+        self.matrix = SparseMatrix(rows=4, cols=4)
+
+    def assertAgrees(self, lines):
+        fast = self.matrix._parse_elements_fast(lines)
+        try:
+            slow = self.matrix._parse_elements(lines)
+        except (ValueError, MatrixIndexError):
+            self.assertIsNone(fast, lines)
+            return
+        if fast is not None:
+            self.assertEqual(fast, slow, lines)
+
+    def test_well_formed_block(self):
+        lines = ['(0, 1, 5)\n', '\n', '(3,2,-7)\n', '( 4 , 4 , 1 )\n', '(1, 1, 0)']
+        self.assertEqual(
+            self.matrix._parse_elements_fast(lines),
+            ([0, 3, 3], [1, 2, 3], [5, -7, 1]),
+        )
+        self.assertAgrees(lines)
+
+    def test_unusual_lines_defer_to_line_parser(self):
+        for lines in (
+            ['(0,1,5) (1,1,1)\n'],
+            ['(0,1,5)\n', '   \n', '(1,1,1)\n'],
+            ['(0,1,\n', '5)\n'],
+            ['(0,1,x)\n'],
+            ['(9,1,1)\n'],
+            ['0,1,5\n'],
+        ):
+            self.assertIsNone(self.matrix._parse_elements_fast(lines), lines)
+            self.assertAgrees(lines)
+
+    def test_random_lines(self):
+        rng = random.Random(1234)
+        noise = ['(', ')', ',', ' ', '\t', '\n', '-', 'x', '9']
+
+        def line():
+            # Indices equal to the dimension (4) are adjusted; -1 and 5 are out of range
+            row, col = (rng.choice([0, 1, 2, 3, 4] * 10 + [-1, 5]) for _ in range(2))
+            value = rng.randint(-3, 3)
+            pad = lambda: rng.choice(['', ' ', '  ', '\t'])
+            # Trailing whitespace is valid but always takes the line parser
+            tail = rng.choice(['', '', '', '', ' '])
+            text = f"{pad()}({pad()}{row}{pad()},{pad()}{col},{pad()}{value}{pad()}){tail}"
+            if rng.random() < 0.1:
+                # Corrupt the line by inserting, deleting or duplicating text
+                at = rng.randrange(len(text) + 1)
+                text = rng.choice([
+                    text[:at] + rng.choice(noise) + text[at:],
+                    text[:at] + text[at + 1:],
+                    text + text,
+                ])
+            return rng.choice([text, text, text, '', '  '])
+
+        for _ in range(2000):
+            lines = [line() + '\n' for _ in range(rng.randint(0, 8))]
+            if lines and rng.random() < 0.5:
+                lines[-1] = lines[-1].rstrip('\n')
+            self.assertAgrees(lines)
+
+
+class LoadTest(MatrixFileTestCase):
+
+    def test_bare_carriage_return_line_endings(self):
+        path = self.write('rows=3\rcols=3\r(0,1,2)\r(2,0,4)\r', newline='')
+        matrix = SparseMatrix(path)
+        self.assertEqual(matrix.data, {0: {1: 2}, 2: {0: 4}})
+        self.assertEqual(matrix.nnz, 2)
+
+    def test_blocks_sharing_rows_and_duplicates(self):
+        lines = ['(3, 1, 1)', '(0, 2, 2)', '(3, 1, 9)', '(1, 1, 1)', '(3, 0, 5)', '(0, 2, 0)']
+        path = self.write('rows=5\ncols=5\n' + '\n'.join(lines) + '\n')
+        whole = SparseMatrix(path)
+        with mock.patch.object(main, '_BLOCK_SIZE', 8):
+            blocks = SparseMatrix(path)
+
+        # Later entries win; zero values are skipped, as in the line parser
+        expected = {0: {2: 2}, 1: {1: 1}, 3: {0: 5, 1: 9}}
+        for matrix in (whole, blocks):
+            self.assertEqual(matrix.data, expected)
+            self.assertEqual(matrix.nnz, 4)
+            self.assertEqual(
+                self.saved_lines(matrix),
+                ['rows=5', 'cols=5', '(0, 2, 2)', '(1, 1, 1)', '(3, 0, 5)', '(3, 1, 9)'],
+            )
+
+    def test_error_names_line_in_later_block(self):
+        path = self.write('rows=3\ncols=3\n' + '(0, 0, 1)\n' * 20 + '(0, 1, x)\n')
+        with mock.patch.object(main, '_BLOCK_SIZE', 16):
+            with self.assertRaisesRegex(ValueError, r'\(0, 1, x\)'):
+                SparseMatrix(path)
+
+
+class OrderTest(MatrixFileTestCase):
+    """save_to_file and to_csr rely on the _ordered flag"""
+
+    def test_sorted_file_loads_ordered(self):
+        path = self.write('rows=3\ncols=3\n(0, 1, 2)\n(1, 2, 3)\n')
+        with mock.patch.object(main, '_BLOCK_SIZE', 8):
+            matrix = SparseMatrix(path)
+        self.assertTrue(matrix._ordered)
+
+    def test_out_of_order_blocks_clear_flag(self):
+        path = self.write('rows=3\ncols=3\n(1, 2, 3)\n(0, 1, 2)\n')
+        with mock.patch.object(main, '_BLOCK_SIZE', 8):
+            matrix = SparseMatrix(path)
+        self.assertFalse(matrix._ordered)
+        self.assertEqual(self.saved_lines(matrix)[2:], ['(0, 1, 2)', '(1, 2, 3)'])
+        self.assertTrue(matrix._ordered)
+
+    def test_set_element_keeps_output_sorted(self):
+        matrix = SparseMatrix(self.write('rows=3\ncols=3\n(0, 1, 2)\n(1, 2, 3)\n'))
+        matrix.save_to_file(os.path.join(self._tmp.name, 'first.txt'))
+        matrix.set_element(0, 0, 9)
+        self.assertFalse(matrix._ordered)
+        self.assertEqual(
+            self.saved_lines(matrix)[2:],
+            ['(0, 0, 9)', '(0, 1, 2)', '(1, 2, 3)'],
+        )
+        self.assertEqual(list(matrix.to_csr()[0]), [9, 2, 3])
+
+    def test_direct_data_write(self):
+        matrix = SparseMatrix(self.write('rows=3\ncols=3\n(0, 1, 2)\n(1, 2, 3)\n'))
+        data = matrix.data
+        self.assertEqual(list(matrix.to_csr()[0]), [2, 3])
+        matrix.data[0][0] = 9
+        self.assertEqual(list(matrix.to_csr()[0]), [9, 2, 3])
+        self.assertEqual(
+            self.saved_lines(matrix)[2:],
+            ['(0, 0, 9)', '(0, 1, 2)', '(1, 2, 3)'],
+        )
+        # Sorting refills the storage instead of replacing it
+        self.assertIs(matrix.data, data)
+
+
+class CsrTest(unittest.TestCase):
+
+    def test_parts_are_arrays(self):
+        matrix = SparseMatrix(rows=3, cols=3)
+        matrix.set_element(0, 1, 5)
+        matrix.set_element(2, 2, 3)
+        values, col_indices, row_ptr = matrix.to_csr()
+        self.assertEqual((values.tolist(), col_indices.tolist(), row_ptr.tolist()),
+                         ([5, 3], [1, 2], [0, 1, 1, 2]))
+
+        matrix.set_element(1, 1, 2.5)
+        parts = matrix.to_csr()
+        self.assertTrue(all(isinstance(part, array) for part in parts))
+        self.assertEqual(parts[0].typecode, 'd')
+        self.assertEqual(parts[0].tolist(), [5.0, 2.5, 3.0])
+
+    def test_result_is_a_copy(self):
+        matrix = SparseMatrix(rows=2, cols=2)
+        matrix.set_element(1, 0, 4)
+        matrix.to_csr()[0][0] = 100
+        self.assertEqual(matrix.to_csr()[0].tolist(), [4])
+
+
+if __name__ == '__main__':
+    unittest.main()